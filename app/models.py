@@ -1,6 +1,60 @@
-from sqlmodel import SQLModel, Field, Relationship, Column, JSON
+import orjson
+from pydantic import AfterValidator
+from sqlalchemy import DDL, CheckConstraint, DateTime, String, event, text
+from sqlalchemy.dialects.postgresql import CITEXT
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import get_history
+from sqlalchemy.sql.functions import FunctionElement
+from sqlmodel import SQLModel, Field, Relationship, Column, JSON, Index, Session, col, select
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Annotated, Optional, List, Dict, Any, Iterable
+
+
+def _name_column(length: int) -> Column:
+    """Unique, case-insensitive name column: NOCASE collation on SQLite, CITEXT on PostgreSQL.
+
+    The index itself is case-folded, so lookups compare with a plain `name = :q` instead of LOWER(name).
+    CITEXT has no length, so a CHECK keeps the limit; length() counts characters on both backends.
+    """
+    return Column(
+        String(length, collation="NOCASE").with_variant(CITEXT(), "postgresql"),
+        CheckConstraint(f"length(name) <= {length}"),
+        unique=True,
+        index=True,
+        nullable=False,
+    )
+
+
+class UtcNow(FunctionElement):
+    """Current UTC time, computed by the database; the server-side counterpart of datetime.utcnow()."""
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(UtcNow, "sqlite")
+def _compile_utc_now_sqlite(_element, _compiler, **_kw) -> str:
+    # CURRENT_TIMESTAMP only has whole seconds; keep milliseconds so recency ordering stays meaningful
+    return "(STRFTIME('%Y-%m-%d %H:%M:%f', 'now'))"
+
+
+@compiles(UtcNow, "postgresql")
+def _compile_utc_now_postgresql(_element, _compiler, **_kw) -> str:
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+
+def _timestamp_column(index: bool = False, on_update: bool = False) -> Column:
+    """Timestamp filled in by the database on insert and, with on_update, on every UPDATE of the row."""
+    return Column(
+        DateTime, server_default=UtcNow(), onupdate=UtcNow() if on_update else None, index=index, nullable=False
+    )
+
+
+# CITEXT ships as an extension; it has to exist before the tables using it
+event.listen(
+    SQLModel.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS citext").execute_if(dialect="postgresql")
+)
 
 
 # Association table for many-to-many relationship between notes and tags
@@ -14,13 +68,15 @@ class NoteTag(SQLModel, table=True):
 # Persistent models (stored in database)
 class Category(SQLModel, table=True):
     __tablename__ = "categories"  # type: ignore[assignment]
+    # Read the server-generated timestamps back in the INSERT/UPDATE itself (RETURNING), not on next access
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    name: str = Field(max_length=100, unique=True, index=True)
+    name: str = Field(max_length=100, sa_column=_name_column(100))
     description: str = Field(default="", max_length=500)
     color: str = Field(default="#6B7280", max_length=7)  # Hex color code for theming
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: Optional[datetime] = Field(default=None, sa_column=_timestamp_column())
+    updated_at: Optional[datetime] = Field(default=None, sa_column=_timestamp_column(on_update=True))
 
     # Relationships
     notes: List["Note"] = Relationship(back_populates="category")
@@ -28,37 +84,167 @@ class Category(SQLModel, table=True):
 
 class Tag(SQLModel, table=True):
     __tablename__ = "tags"  # type: ignore[assignment]
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    name: str = Field(max_length=50, unique=True, index=True)
+    name: str = Field(max_length=50, sa_column=_name_column(50))
     color: str = Field(default="#374151", max_length=7)  # Hex color code for theming
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: Optional[datetime] = Field(default=None, sa_column=_timestamp_column())
 
     # Relationships
     notes: List["Note"] = Relationship(back_populates="tags", link_model=NoteTag)
 
 
+class NoteMetadataSource(FunctionElement):
+    """note_metadata['source'] as text, rendered with a literal JSON path.
+
+    Used both as the ix_notes_meta_source expression and in queries: the planner only picks an
+    expression index when the query repeats the same expression, and a bound JSON path (what
+    Note.note_metadata["source"] compiles to on SQLite) never matches.
+    """
+
+    type = String()
+    inherit_cache = True
+
+
+@compiles(NoteMetadataSource, "sqlite")
+def _compile_note_metadata_source_sqlite(_element, _compiler, **_kw) -> str:
+    return "json_extract(note_metadata, '$.source')"
+
+
+@compiles(NoteMetadataSource, "postgresql")
+def _compile_note_metadata_source_postgresql(_element, _compiler, **_kw) -> str:
+    return "(note_metadata ->> 'source')"
+
+
+# Full-text document for PostgreSQL; search queries must use this exact expression to hit ix_notes_search
+NOTE_SEARCH_DOCUMENT = "to_tsvector('english', title || ' ' || content)"
+
+
 class Note(SQLModel, table=True):
     __tablename__ = "notes"  # type: ignore[assignment]
+    __table_args__ = (
+        # Composite indexes matching the list view predicates; trailing id keeps pagination on the index.
+        # The default list only shows non-archived notes, so its index leaves archived rows out entirely;
+        # list queries must keep the is_archived = false predicate for the planner to use it.
+        Index(
+            "ix_notes_active",
+            "is_pinned",
+            "updated_at",
+            "id",
+            sqlite_where=text("is_archived = 0"),
+            postgresql_where=text("NOT is_archived"),
+        ),
+        Index("ix_notes_cat_updated", "category_id", "updated_at", "id"),
+        Index("ix_notes_search", text(NOTE_SEARCH_DOCUMENT), postgresql_using="gin").ddl_if(dialect="postgresql"),
+        Index("ix_notes_meta_source", NoteMetadataSource()),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str = Field(max_length=200, index=True)
     content: str = Field(default="", max_length=10000)
-    is_pinned: bool = Field(default=False, index=True)
-    is_archived: bool = Field(default=False, index=True)
+    is_pinned: bool = Field(default=False)
+    is_archived: bool = Field(default=False)
+    word_count: int = Field(default=0, ge=0)  # Maintained by the before_insert/before_update hook below
     note_metadata: Dict[str, Any] = Field(default={}, sa_column=Column(JSON))
-    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
-    updated_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    # Sorted copy of the tag names, so rendering a note never touches note_tags; see the tag hooks below
+    tag_names_cache: List[str] = Field(default=[], sa_column=Column(JSON))
+    created_at: Optional[datetime] = Field(default=None, sa_column=_timestamp_column(index=True))
+    updated_at: Optional[datetime] = Field(default=None, sa_column=_timestamp_column(index=True, on_update=True))
 
     # Foreign keys
-    category_id: Optional[int] = Field(default=None, foreign_key="categories.id", index=True)
+    category_id: Optional[int] = Field(default=None, foreign_key="categories.id")
 
     # Relationships
-    category: Optional[Category] = Relationship(back_populates="notes")
+    # Eager-loaded so rendering category_name doesn't issue one query per note
+    category: Optional[Category] = Relationship(back_populates="notes", sa_relationship_kwargs={"lazy": "joined"})
+    # Loaded on access only: tag_names reads tag_names_cache
     tags: List[Tag] = Relationship(back_populates="notes", link_model=NoteTag)
 
+    # Read by NoteResponse.model_validate(note)
+    @property
+    def category_name(self) -> Optional[str]:
+        return self.category.name if self.category is not None else None
+
+    @property
+    def tag_names(self) -> List[str]:
+        return self.tag_names_cache or []
+
+
+@event.listens_for(Note, "before_insert")
+@event.listens_for(Note, "before_update")
+def _update_word_count(_mapper, _connection, note: Note) -> None:
+    """Recount words once per flush so callers never have to."""
+    note.word_count = len(note.content.split())
+
+
+def sort_tag_names(names: Iterable[str]) -> List[str]:
+    """The order tag_names_cache is kept in. Every writer sorts here, in Python, so they all agree.
+
+    Case-insensitive like the name column, but not via ORDER BY: SQLite's NOCASE only folds ASCII.
+    """
+    return sorted(set(names), key=str.lower)
+
+
+@event.listens_for(Note.tags, "append")
+def _cache_appended_tag_name(note: Note, tag: Tag, _initiator) -> None:
+    note.tag_names_cache = sort_tag_names([*note.tag_names, tag.name])
+
+
+@event.listens_for(Note.tags, "remove")
+def _uncache_removed_tag_name(note: Note, tag: Tag, _initiator) -> None:
+    note.tag_names_cache = sort_tag_names(set(note.tag_names) - {tag.name})
+
+
+@event.listens_for(Session, "before_flush")
+def _refresh_tag_names_caches(session: Session, _flush_context, _instances) -> None:
+    """Renamed or deleted tags are rewritten in the cache of every note carrying them."""
+    changed_tags = [tag for tag in session.dirty if isinstance(tag, Tag) and get_history(tag, "name").has_changes()]
+    changed_tags += [tag for tag in session.deleted if isinstance(tag, Tag)]
+    if not changed_tags:
+        return
+    with session.no_autoflush:
+        changed_ids = [tag.id for tag in changed_tags]
+        notes = session.exec(
+            select(Note).join(NoteTag).where(col(NoteTag.tag_id).in_(changed_ids)).options(selectinload(Note.tags))  # type: ignore[arg-type]
+        ).all()
+        for note in notes:
+            # The identity map hands back the pending tag objects, so renames show their new name
+            note.tag_names_cache = sort_tag_names(tag.name for tag in note.tags if tag not in session.deleted)
+
+
+# SQLite full-text search: an external-content FTS5 table over notes, kept in sync by triggers
+_SQLITE_NOTES_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5("
+    "title, content, content='notes', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS notes_fts_ai AFTER INSERT ON notes BEGIN "
+    "INSERT INTO notes_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END",
+    "CREATE TRIGGER IF NOT EXISTS notes_fts_ad AFTER DELETE ON notes BEGIN "
+    "INSERT INTO notes_fts(notes_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content); END",
+    "CREATE TRIGGER IF NOT EXISTS notes_fts_au AFTER UPDATE OF title, content ON notes BEGIN "
+    "INSERT INTO notes_fts(notes_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content); "
+    "INSERT INTO notes_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END",
+]
+_notes_table = Note.__table__  # type: ignore[attr-defined]
+for _statement in _SQLITE_NOTES_FTS_DDL:
+    event.listen(_notes_table, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(_notes_table, "after_drop", DDL("DROP TABLE IF EXISTS notes_fts").execute_if(dialect="sqlite"))
+
 
 # Non-persistent schemas (for validation, forms, API requests/responses)
+def _check_storable_metadata(value: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON columns are written with orjson (see app.database), which rejects integers outside the 64-bit range."""
+    try:
+        orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    except orjson.JSONEncodeError as error:
+        raise ValueError(f"note_metadata can't be stored as JSON: {error}") from error
+    return value
+
+
+StorableMetadata = Annotated[Dict[str, Any], AfterValidator(_check_storable_metadata)]
+
+
 class CategoryCreate(SQLModel, table=False):
     name: str = Field(max_length=100)
     description: str = Field(default="", max_length=500)
@@ -87,7 +273,7 @@ class NoteCreate(SQLModel, table=False):
     category_id: Optional[int] = Field(default=None)
     tag_ids: List[int] = Field(default=[])
     is_pinned: bool = Field(default=False)
-    note_metadata: Dict[str, Any] = Field(default={})
+    note_metadata: StorableMetadata = Field(default={})
 
 
 class NoteUpdate(SQLModel, table=False):
@@ -97,7 +283,7 @@ class NoteUpdate(SQLModel, table=False):
     tag_ids: Optional[List[int]] = Field(default=None)
     is_pinned: Optional[bool] = Field(default=None)
     is_archived: Optional[bool] = Field(default=None)
-    note_metadata: Optional[Dict[str, Any]] = Field(default=None)
+    note_metadata: Optional[StorableMetadata] = Field(default=None)
 
 
 class NoteResponse(SQLModel, table=False):
@@ -106,8 +292,9 @@ class NoteResponse(SQLModel, table=False):
     content: str
     is_pinned: bool
     is_archived: bool
-    created_at: str  # ISO format string
-    updated_at: str  # ISO format string
+    word_count: int = Field(default=0)
+    created_at: datetime
+    updated_at: datetime
     category_id: Optional[int]
     category_name: Optional[str] = None
     tag_names: List[str] = Field(default=[])
@@ -119,8 +306,8 @@ class CategoryResponse(SQLModel, table=False):
     name: str
     description: str
     color: str
-    created_at: str  # ISO format string
-    updated_at: str  # ISO format string
+    created_at: datetime
+    updated_at: datetime
     note_count: int = Field(default=0)
 
 
@@ -128,5 +315,16 @@ class TagResponse(SQLModel, table=False):
     id: int
     name: str
     color: str
-    created_at: str  # ISO format string
+    created_at: datetime
     note_count: int = Field(default=0)
+
+
+class NoteSearchResult(SQLModel, table=False):
+    id: int
+    title: str
+    snippet: str
+    category_name: Optional[str] = None
+    tag_names: List[str] = Field(default=[])
+    created_at: datetime
+    updated_at: datetime
+    relevance_score: float = Field(default=0.0)  # Higher is more relevant
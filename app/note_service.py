@@ -0,0 +1,275 @@
+from threading import Lock
+from typing import Dict, List, Optional, Sequence, Set
+
+from sqlalchemy import column, event, lambda_stmt, literal, literal_column, table
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import lazyload, load_only, object_session
+from sqlmodel import Session, col, delete, desc, func, select
+
+from app.database import get_read_session, get_session
+from app.models import (
+    NOTE_SEARCH_DOCUMENT,
+    Category,
+    Note,
+    NoteCreate,
+    NoteMetadataSource,
+    NoteResponse,
+    NoteSearchResult,
+    NoteTag,
+    NoteUpdate,
+    Tag,
+    sort_tag_names,
+)
+
+SNIPPET_LENGTH = 200
+CATEGORY_NAME_CACHE_SIZE = 4096
+
+# The FTS5 table is created by DDL in app.models, so it has no mapped class
+_notes_fts = table("notes_fts", column("rowid"))
+
+
+class _CategoryNameCache:
+    """Category names by id, so list/search responses don't join categories for every row.
+
+    Misses are filled on the caller's session, never a session of its own. Every commit that changes
+    a category clears the cache and bumps the generation; a read only stores names if no such commit
+    happened since it captured the generation, before its first query, so it can't re-cache an old name.
+    Holds at most max_size names and starts over once full.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self._names: Dict[int, str] = {}
+        self._lock = Lock()
+        self.max_size = max_size
+        self.generation = 0
+
+    def resolve(self, session: Session, category_ids: Set[int], generation: int) -> Dict[int, str]:
+        names = {category_id: self._names[category_id] for category_id in category_ids if category_id in self._names}
+        missing = category_ids - names.keys()
+        if missing:
+            rows = session.execute(select(Category.id, Category.name).where(col(Category.id).in_(missing))).all()
+            fetched = {category_id: name for category_id, name in rows}
+            names.update(fetched)
+            with self._lock:
+                if generation == self.generation:
+                    if len(self._names) + len(fetched) > self.max_size:
+                        self._names.clear()
+                    self._names.update(fetched)
+        return names
+
+    def clear(self) -> None:
+        with self._lock:
+            self._names.clear()
+            self.generation += 1
+
+
+_category_names = _CategoryNameCache(CATEGORY_NAME_CACHE_SIZE)
+
+
+def clear_category_name_cache() -> None:
+    _category_names.clear()
+
+
+def _resolve_category_names(session: Session, notes: Sequence[Note], generation: int) -> Dict[int, str]:
+    category_ids = {note.category_id for note in notes if note.category_id is not None}
+    return _category_names.resolve(session, category_ids, generation)
+
+
+def _category_name(note: Note, category_names: Dict[int, str]) -> Optional[str]:
+    return category_names.get(note.category_id) if note.category_id is not None else None
+
+
+def _mark_categories_changed(_mapper, _connection, category: Category) -> None:
+    session = object_session(category)
+    if session is not None:
+        session.info["categories_changed"] = True
+
+
+for _event_name in ("after_insert", "after_update", "after_delete"):
+    event.listen(Category, _event_name, _mark_categories_changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _clear_category_name_cache(session: Session) -> None:
+    # Cleared only once the change is committed, so a read between flush and commit can't re-cache the old name
+    if session.info.pop("categories_changed", False):
+        _category_names.clear()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_category_changes(session: Session) -> None:
+    session.info.pop("categories_changed", None)
+
+
+def _insert(session: Session, model: type) -> sqlite.Insert | postgresql.Insert:
+    """Dialect-specific INSERT, which is what provides on_conflict_do_nothing()."""
+    match session.get_bind().dialect.name:
+        case "sqlite":
+            return sqlite.insert(model)
+        case _:
+            return postgresql.insert(model)
+
+
+def set_tags(session: Session, note_id: int, tag_ids: List[int]) -> None:
+    """Replace a note's tags in two statements instead of diffing the ORM collection row by row.
+
+    Unknown tag ids are ignored. The caller commits; note.tags is expired so it reloads afterwards,
+    and note.tag_names_cache is rebuilt since these statements bypass the collection events.
+    """
+    session.execute(delete(NoteTag).where(col(NoteTag.note_id) == note_id, col(NoteTag.tag_id).not_in(tag_ids)))
+    if tag_ids:
+        existing_tags = select(literal(note_id), col(Tag.id)).where(col(Tag.id).in_(tag_ids))
+        session.execute(
+            _insert(session, NoteTag).from_select(["note_id", "tag_id"], existing_tags).on_conflict_do_nothing()
+        )
+    note = session.get(Note, note_id)
+    if note is not None:
+        session.expire(note, ["tags"])
+        tag_names = select(Tag.name).join(NoteTag).where(col(NoteTag.note_id) == note_id)
+        note.tag_names_cache = sort_tag_names(session.exec(tag_names).all())
+
+
+def _tag_names(session: Session, tag_ids: List[int]) -> List[str]:
+    if not tag_ids:
+        return []
+    return sort_tag_names(session.exec(select(Tag.name).where(col(Tag.id).in_(tag_ids))).all())
+
+
+def get_note(note_id: int) -> Optional[NoteResponse]:
+    with get_read_session() as session:
+        note = session.get(Note, note_id)
+        if note is None:
+            return None
+        return NoteResponse.model_validate(note)
+
+
+def list_notes(
+    category_id: Optional[int] = None,
+    source: Optional[str] = None,
+    include_archived: bool = False,
+    limit: int = 50,
+    offset: int = 0,
+) -> List[NoteResponse]:
+    """Pinned notes first, then most recently updated.
+
+    Built as a lambda statement so each query shape is constructed and cache-keyed once per process;
+    the closure variables (category_id, source, limit, offset) become bound parameters.
+    """
+    with get_read_session() as session:
+        generation = _category_names.generation
+        statement = lambda_stmt(lambda: select(Note).options(lazyload(Note.category)))  # type: ignore[arg-type]
+        if not include_archived:
+            statement += lambda s: s.where(Note.is_archived == False)  # noqa: E712
+        if category_id is not None:
+            statement += lambda s: s.where(Note.category_id == category_id)
+        if source is not None:
+            statement += lambda s: s.where(NoteMetadataSource() == source)
+        statement += lambda s: (
+            s.order_by(desc(Note.is_pinned), desc(Note.updated_at), desc(Note.id)).offset(offset).limit(limit)
+        )
+        notes = session.execute(statement).scalars().all()
+        category_names = _resolve_category_names(session, notes, generation)
+        return [
+            NoteResponse.model_validate(note, update={"category_name": _category_name(note, category_names)})
+            for note in notes
+        ]
+
+
+def create_note(data: NoteCreate) -> NoteResponse:
+    with get_session() as session:
+        note = Note(
+            title=data.title,
+            content=data.content,
+            category_id=data.category_id,
+            is_pinned=data.is_pinned,
+            note_metadata=data.note_metadata,
+            # Filled up front so the INSERT already carries it; set_tags then finds nothing to update
+            tag_names_cache=_tag_names(session, data.tag_ids),
+        )
+        session.add(note)
+        session.flush()
+        if note.id is None:
+            raise ValueError("Note id was not assigned on flush")
+        set_tags(session, note.id, data.tag_ids)
+        session.commit()
+        session.refresh(note)
+        return NoteResponse.model_validate(note)
+
+
+def update_note(note_id: int, data: NoteUpdate) -> Optional[NoteResponse]:
+    with get_session() as session:
+        note = session.get(Note, note_id)
+        if note is None:
+            return None
+        # None means "leave unchanged", except for category_id, where it removes the note from its category
+        updates = data.model_dump(exclude_unset=True, exclude_none=True, exclude={"tag_ids"})
+        if "category_id" in data.model_fields_set:
+            updates["category_id"] = data.category_id
+        for field, value in updates.items():
+            setattr(note, field, value)
+        if data.tag_ids is not None:
+            set_tags(session, note_id, data.tag_ids)
+        session.add(note)
+        session.commit()
+        session.refresh(note)
+        return NoteResponse.model_validate(note)
+
+
+def _fts5_query(query: str) -> str:
+    """Quote each term so user input can't trip FTS5 query syntax; terms are ANDed."""
+    return " ".join('"{}"'.format(term.replace('"', '""')) for term in query.split())
+
+
+def search_notes(query: str, limit: int = 20) -> List[NoteSearchResult]:
+    """Full-text search over title and content, best matches first."""
+    if not query.strip():
+        return []
+    # Only the columns a search result shows: the content body and metadata stay in the database
+    snippet = func.substr(Note.content, 1, SNIPPET_LENGTH).label("snippet")
+    load_options = (
+        load_only(
+            Note.id,  # type: ignore[arg-type]
+            Note.title,  # type: ignore[arg-type]
+            Note.tag_names_cache,  # type: ignore[arg-type]
+            Note.created_at,  # type: ignore[arg-type]
+            Note.updated_at,  # type: ignore[arg-type]
+            Note.category_id,  # type: ignore[arg-type]
+        ),
+        lazyload(Note.category),  # type: ignore[arg-type]
+    )
+    with get_read_session() as session:
+        generation = _category_names.generation
+        match session.get_bind().dialect.name:
+            case "sqlite":
+                # bm25() is lower-is-better, so negate it for relevance_score
+                rank = func.bm25(literal_column("notes_fts"))
+                statement = (
+                    select(Note, snippet, (-rank).label("relevance_score"))
+                    .options(*load_options)
+                    .join(_notes_fts, _notes_fts.c.rowid == Note.id)
+                    .where(literal_column("notes_fts").match(_fts5_query(query)))
+                    .order_by(rank)
+                )
+            case _:
+                document = literal_column(NOTE_SEARCH_DOCUMENT)
+                tsquery = func.plainto_tsquery("english", query)
+                rank = func.ts_rank(document, tsquery)
+                statement = (
+                    select(Note, snippet, rank.label("relevance_score"))
+                    .options(*load_options)
+                    .where(document.op("@@")(tsquery))
+                    .order_by(desc(rank))
+                )
+        rows = session.exec(statement.limit(limit)).all()
+        category_names = _resolve_category_names(session, [note for note, _snippet, _score in rows], generation)
+        return [
+            NoteSearchResult.model_validate(
+                note,
+                update={
+                    "snippet": note_snippet,
+                    "category_name": _category_name(note, category_names),
+                    "relevance_score": float(score),
+                },
+            )
+            for note, note_snippet, score in rows
+        ]
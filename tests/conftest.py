@@ -1,5 +1,7 @@
 from typing import Generator
 import pytest
+from app.database import reset_db
+from app.note_service import clear_category_name_cache
 from app.startup import startup
 from nicegui.testing import User
 
@@ -10,3 +12,11 @@ pytest_plugins = ["nicegui.testing.plugin"]
 def user(user: User) -> Generator[User, None, None]:
     startup()
     yield user
+
+
+@pytest.fixture()
+def clean_db():
+    reset_db()
+    clear_category_name_cache()  # ids are reused once the tables are recreated
+    yield
+    reset_db()
@@ -0,0 +1,19 @@
+import sqlite3
+
+from sqlalchemy import text
+from sqlmodel import create_engine
+
+from app.database import _sqlite_read_only_url
+
+
+def test_read_only_connection_opens_database_not_in_wal_mode(tmp_path):
+    path = tmp_path / "notes.db"
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE items (id INTEGER PRIMARY KEY)")
+
+    read_only_url = _sqlite_read_only_url(f"sqlite:///{path}")
+    assert read_only_url is not None
+    engine = create_engine(read_only_url)
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT COUNT(*) FROM items")).scalar() == 0
+    engine.dispose()
@@ -0,0 +1,232 @@
+import pytest
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from app.database import ENGINE
+from app.models import Category, Note, NoteCreate, NoteUpdate, Tag
+from app.note_service import (
+    create_note,
+    get_note,
+    list_notes,
+    search_notes,
+    set_tags,
+    update_note,
+)
+
+
+@pytest.fixture()
+def sample_data(clean_db):
+    with Session(ENGINE) as session:
+        category = Category(name="Work")
+        tags = [Tag(name="urgent"), Tag(name="ideas")]
+        session.add(category)
+        session.add_all(tags)
+        session.commit()
+        return {"category_id": category.id, "tag_ids": [tag.id for tag in tags]}
+
+
+def test_create_note_resolves_category_and_tags(sample_data):
+    note = create_note(
+        NoteCreate(
+            title="Plan", content="Ship it", category_id=sample_data["category_id"], tag_ids=sample_data["tag_ids"]
+        )
+    )
+
+    assert note.id is not None
+    assert note.category_name == "Work"
+    assert sorted(note.tag_names) == ["ideas", "urgent"]
+
+
+def test_create_note_with_tags_is_a_single_write(sample_data):
+    note = create_note(NoteCreate(title="Plan", tag_ids=sample_data["tag_ids"]))
+
+    # updated_at only moves on an UPDATE, and the tags are already part of the INSERT
+    assert note.created_at is not None
+    assert note.updated_at == note.created_at
+
+
+def test_get_note_missing_returns_none(clean_db):
+    assert get_note(999) is None
+
+
+def test_update_note_applies_only_set_fields(sample_data):
+    created = create_note(NoteCreate(title="Draft", content="text", tag_ids=sample_data["tag_ids"]))
+
+    updated = update_note(created.id, NoteUpdate(title="Final", tag_ids=[sample_data["tag_ids"][1]]))
+
+    assert updated is not None
+    assert updated.title == "Final"
+    assert updated.content == "text"
+    assert updated.tag_names == ["ideas"]
+
+
+def test_update_note_treats_none_as_unchanged(sample_data):
+    created = create_note(
+        NoteCreate(title="Draft", content="text", is_pinned=True, category_id=sample_data["category_id"])
+    )
+
+    updated = update_note(created.id, NoteUpdate(title=None, content=None, is_pinned=None))
+
+    assert updated is not None
+    assert (updated.title, updated.content, updated.is_pinned) == ("Draft", "text", True)
+    assert updated.category_name == "Work"
+
+
+def test_update_note_clears_category_with_explicit_none(sample_data):
+    created = create_note(NoteCreate(title="Filed", category_id=sample_data["category_id"]))
+
+    updated = update_note(created.id, NoteUpdate(category_id=None))
+
+    assert updated is not None
+    assert updated.category_id is None
+    assert updated.category_name is None
+
+
+def test_set_tags_replaces_assignment_and_ignores_unknown_ids(sample_data):
+    urgent_id, ideas_id = sample_data["tag_ids"]
+    note = create_note(NoteCreate(title="Tagged", tag_ids=[urgent_id]))
+
+    with Session(ENGINE) as session:
+        set_tags(session, note.id, [ideas_id, ideas_id, 999])
+        session.commit()
+
+    fetched = get_note(note.id)
+    assert fetched is not None
+    assert fetched.tag_names == ["ideas"]
+
+
+def test_tag_names_cache_follows_tag_changes(sample_data):
+    urgent_id, ideas_id = sample_data["tag_ids"]
+    note = create_note(NoteCreate(title="Tagged", tag_ids=[urgent_id]))
+
+    with Session(ENGINE) as session:
+        stored = session.get(Note, note.id)
+        urgent, ideas = session.get(Tag, urgent_id), session.get(Tag, ideas_id)
+        assert stored is not None and urgent is not None and ideas is not None
+        stored.tags.append(ideas)
+        session.commit()
+        urgent.name = "asap"
+        session.commit()
+
+    fetched = get_note(note.id)
+    assert fetched is not None
+    assert fetched.tag_names == ["asap", "ideas"]
+
+    with Session(ENGINE) as session:
+        session.delete(session.get(Tag, ideas_id))
+        session.commit()
+
+    assert [result.tag_names for result in search_notes("tagged")] == [["asap"]]
+
+
+def test_tag_names_match_case_insensitively(sample_data):
+    with Session(ENGINE) as session:
+        tag = session.exec(select(Tag).where(Tag.name == "URGENT")).first()
+        assert tag is not None
+        assert tag.id == sample_data["tag_ids"][0]
+
+        session.add(Tag(name="Urgent"))
+        with pytest.raises(IntegrityError):
+            session.commit()
+        session.rollback()
+
+        session.add(Tag(name="x" * 51))
+        with pytest.raises(IntegrityError):
+            session.commit()
+
+
+def test_tag_names_cache_order_is_the_same_for_every_writer(clean_db):
+    with Session(ENGINE) as session:
+        tags = [Tag(name="Émile"), Tag(name="zeta"), Tag(name="éclair")]
+        session.add_all(tags)
+        session.commit()
+        tag_ids = [tag.id for tag in tags if tag.id is not None]
+
+        note = Note(title="Appended")
+        session.add(note)
+        note.tags.extend(tags)
+        session.commit()
+        appended_id = note.id
+
+    assigned = create_note(NoteCreate(title="Assigned", tag_ids=tag_ids))
+    appended = get_note(appended_id) if appended_id is not None else None
+
+    assert appended is not None
+    assert assigned.tag_names == appended.tag_names == ["zeta", "éclair", "Émile"]
+
+
+def test_word_count_tracks_content(clean_db):
+    note = create_note(NoteCreate(title="Words", content="one two  three\nfour"))
+    assert note.word_count == 4
+
+    updated = update_note(note.id, NoteUpdate(content="just two"))
+    assert updated is not None
+    assert updated.word_count == 2
+
+
+def test_update_note_missing_returns_none(clean_db):
+    assert update_note(999, NoteUpdate(title="Nope")) is None
+
+
+def test_list_notes_orders_pinned_first_and_hides_archived(clean_db):
+    older = create_note(NoteCreate(title="Older"))
+    create_note(NoteCreate(title="Newer"))
+    create_note(NoteCreate(title="Pinned", is_pinned=True))
+    update_note(older.id, NoteUpdate(is_archived=True))
+
+    assert [note.title for note in list_notes()] == ["Pinned", "Newer"]
+    assert len(list_notes(include_archived=True)) == 3
+
+
+def test_category_name_cache_refreshes_after_rename(sample_data):
+    create_note(NoteCreate(title="Filed", category_id=sample_data["category_id"]))
+    assert [note.category_name for note in list_notes()] == ["Work"]
+
+    with Session(ENGINE) as session:
+        category = session.get(Category, sample_data["category_id"])
+        assert category is not None
+        category.name = "Office"
+        session.commit()
+
+    assert [note.category_name for note in list_notes()] == ["Office"]
+
+
+def test_list_notes_filters_by_metadata_source(clean_db):
+    create_note(NoteCreate(title="Imported", note_metadata={"source": "import"}))
+    create_note(NoteCreate(title="Typed", note_metadata={"source": "editor"}))
+    create_note(NoteCreate(title="Bare"))
+
+    assert [note.title for note in list_notes(source="import")] == ["Imported"]
+
+
+def test_search_notes_matches_title_and_content(clean_db):
+    create_note(NoteCreate(title="Groceries", content="Buy apples and bread"))
+    create_note(NoteCreate(title="Apples", content="Varieties of apples"))
+    create_note(NoteCreate(title="Meeting", content="Quarterly review"))
+
+    results = search_notes("apples")
+
+    assert {result.title for result in results} == {"Groceries", "Apples"}
+    assert results[0].title == "Apples"
+
+
+def test_search_notes_reflects_updates(clean_db):
+    note = create_note(NoteCreate(title="Draft", content="old wording"))
+    update_note(note.id, NoteUpdate(content="new wording"))
+
+    assert search_notes("old") == []
+    assert [result.id for result in search_notes("new")] == [note.id]
+    assert search_notes("   ") == []
+
+
+def test_note_metadata_round_trips_and_rejects_unstorable_values(clean_db):
+    note = create_note(NoteCreate(title="Meta", note_metadata={"source": "import", "n": [2**63 - 1, 1.5, None]}))
+    fetched = get_note(note.id)
+    assert fetched is not None
+    assert fetched.note_metadata == {"source": "import", "n": [2**63 - 1, 1.5, None]}
+
+    with pytest.raises(ValidationError):
+        NoteCreate(title="Huge", note_metadata={"n": 2**70})
+    with pytest.raises(ValidationError):
+        NoteUpdate(note_metadata={"n": -(2**70)})